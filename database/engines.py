@@ -0,0 +1,110 @@
+import os
+import threading
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Read-only SQLite tuning, overridable from the environment (empty values, as in .env.example, keep the default)
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE") or 1024 * 1024 * 1024)  # Bytes of the file to memory map
+# Negative = KiB of page cache per pooled connection; reads are mostly served by mmap, so this stays small.
+# Worst case memory per SQLite target is SQLITE_POOL_SIZE * |SQLITE_CACHE_SIZE| KiB (8 * 16 MiB = 128 MiB)
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE") or -16 * 1024)
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE") or 8)
+# Only enable when the file is never modified while the app runs: SQLite then skips all locking
+SQLITE_IMMUTABLE = (os.getenv("SQLITE_IMMUTABLE") or "false").lower() == "true"
+
+_engines = {}
+_lock = threading.Lock()
+
+
+def sqlite_path(connection) -> str:
+    return f"./{connection.db_name}.db"
+
+
+def build_connection_string(connection) -> str:
+    # Build connection string based on database type
+    db_type = connection.db_type
+
+    if db_type == 'mysql':
+        driver = 'pymysql'  # or 'mysqlconnector'
+        return f"mysql+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
+    elif db_type == 'postgresql':
+        driver = 'psycopg2'
+        return f"postgresql+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
+    elif db_type == 'sqlite':
+        # Opened through a URI so SQLite itself refuses writes
+        mode = "mode=ro&immutable=1" if SQLITE_IMMUTABLE else "mode=ro"
+        return f"sqlite:///file:{sqlite_path(connection)}?{mode}&uri=true"
+    elif db_type == 'mssql':
+        driver = 'pymssql'
+        return f"mssql+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
+    elif db_type == 'oracle':
+        driver = 'cx_oracle'
+        return f"oracle+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
+    else:
+        raise ValueError(f"Unsupported database type: {db_type}")
+
+
+def _create_sqlite_engine(connection_string: str) -> Engine:
+    engine = create_engine(
+        connection_string,
+        connect_args={"check_same_thread": False},  # Pooled connections are shared across request threads
+        pool_size=SQLITE_POOL_SIZE,
+        max_overflow=0,
+        pool_pre_ping=False
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_read_only_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}")
+        cursor.execute("PRAGMA temp_store = MEMORY")
+        cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    return engine
+
+
+def get_target_engine(connection) -> Engine:
+    """Return the pooled engine used to run queries against a connection's target database.
+
+    Engines are created once per connection and shared across requests. SQLite
+    targets are opened read-only with pragmas tuned for analytical reads.
+    """
+    connection_string = build_connection_string(connection)
+    key = (connection.id, connection_string)
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            if connection.db_type == 'sqlite':
+                engine = _create_sqlite_engine(connection_string)
+            else:
+                engine = create_engine(connection_string)
+            _engines[key] = engine
+        return engine
+
+
+def dispose_target_engine(connection_id: int):
+    """Close pooled connections of a connection, e.g. after it was re-inspected or deleted"""
+    with _lock:
+        for key in [key for key in _engines if key[0] == connection_id]:
+            _engines.pop(key).dispose()
+
+
+def analyze_sqlite(connection):
+    """Run ANALYZE so the SQLite query planner has statistics.
+
+    This is the only write made to a SQLite target, so it uses its own short-lived
+    read-write engine rather than the read-only pool. mode=rw makes a missing file
+    an error instead of silently creating an empty database.
+    """
+    engine = create_engine(f"sqlite:///file:{sqlite_path(connection)}?mode=rw&uri=true")
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("PRAGMA analysis_limit = 1000"))  # Sample large indexes instead of full scans
+            conn.execute(text("ANALYZE"))
+    finally:
+        engine.dispose()
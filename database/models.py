@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from sqlalchemy import create_engine, Column, Integer, String, TIMESTAMP, text, ForeignKey, Boolean, Text
+from sqlalchemy import create_engine, Column, Integer, String, TIMESTAMP, text, ForeignKey, Boolean, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
@@ -52,6 +52,62 @@ class Connection(Base):
     updated_at = Column(TIMESTAMP(timezone=True), nullable=True)
 
     user = relationship('User', back_populates='connections')
+    schema_tables = relationship('SchemaTable', back_populates='connection', cascade='all, delete-orphan')
+    schema_constraints = relationship('SchemaConstraint', back_populates='connection', cascade='all, delete-orphan')
+
+
+class SchemaTable(Base):
+    __tablename__ = 'schema_tables'
+    id = Column(Integer, primary_key=True, nullable=False)
+    connection_id = Column(Integer, ForeignKey('connections.id', ondelete='CASCADE'), nullable=False)
+    table_name = Column(String, nullable=False)
+    table_name_lower = Column(String, nullable=False)  # Lower-cased name for indexed case-insensitive lookups
+    position = Column(Integer, nullable=False)  # Order of the table in the inspected schema
+
+    connection = relationship('Connection', back_populates='schema_tables')
+    columns = relationship('SchemaColumn', back_populates='table', cascade='all, delete-orphan',
+                           order_by='SchemaColumn.position')
+
+    __table_args__ = (
+        Index('ix_schema_tables_connection_table', 'connection_id', 'table_name', unique=True),
+        Index('ix_schema_tables_connection_table_lower', 'connection_id', 'table_name_lower'),
+    )
+
+
+class SchemaColumn(Base):
+    __tablename__ = 'schema_columns'
+    id = Column(Integer, primary_key=True, nullable=False)
+    table_id = Column(Integer, ForeignKey('schema_tables.id', ondelete='CASCADE'), nullable=False)
+    connection_id = Column(Integer, ForeignKey('connections.id', ondelete='CASCADE'), nullable=False)
+    column_name = Column(String, nullable=False)
+    column_name_lower = Column(String, nullable=False)  # Lower-cased name for indexed case-insensitive lookups
+    data_type = Column(String, nullable=False)
+    position = Column(Integer, nullable=False)  # Order of the column in its table
+
+    table = relationship('SchemaTable', back_populates='columns')
+
+    __table_args__ = (
+        Index('ix_schema_columns_table_position', 'table_id', 'position'),
+        Index('ix_schema_columns_connection_column', 'connection_id', 'column_name_lower'),
+    )
+
+
+class SchemaConstraint(Base):
+    __tablename__ = 'schema_constraints'
+    id = Column(Integer, primary_key=True, nullable=False)
+    connection_id = Column(Integer, ForeignKey('connections.id', ondelete='CASCADE'), nullable=False)
+    constraint_type = Column(String, nullable=False)  # PRIMARY KEY, FOREIGN KEY or UNIQUE
+    table_name = Column(String, nullable=False)
+    column_name = Column(String, nullable=False)
+    referenced_table = Column(String, nullable=True)  # Only set for FOREIGN KEY
+    referenced_column = Column(String, nullable=True)  # Only set for FOREIGN KEY
+
+    connection = relationship('Connection', back_populates='schema_constraints')
+
+    __table_args__ = (
+        Index('ix_schema_constraints_connection_table', 'connection_id', 'table_name'),
+        Index('ix_schema_constraints_connection_referenced', 'connection_id', 'referenced_table'),
+    )
 
 
 # Create tables
@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from database.models import Connection
+from database.models import Connection, SchemaTable, SchemaColumn, SchemaConstraint
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from schema_builder import get_db_schema
+from database.engines import analyze_sqlite, dispose_target_engine, sqlite_path
 import json
 
 
@@ -57,17 +58,21 @@ class ConnectionRepository():
 
             self.db.delete(connection)
             self.db.commit()
+            dispose_target_engine(id)
         except Exception as e:
             raise Exception
         return True
 
-    def connect(self, id) -> bool:
+    def connect(self, id, analyze: bool = False) -> bool:
         try:
             connection = self.db.query(Connection).filter(Connection.id == id).first()
             if not connection:
                 raise NoResultFound
             if connection.db_type == 'sqlite':
-                connection_string = f"sqlite:///./{connection.db_name}.db"
+                if analyze:
+                    analyze_sqlite(connection)
+                # Read-only URI: inspecting a missing file raises instead of creating it
+                connection_string = f"sqlite:///file:{sqlite_path(connection)}?mode=ro&uri=true"
                 db_json_schema = get_db_schema(connection_string=connection_string, schema_name=None)
             else:
                 db_config = {
@@ -78,11 +83,107 @@ class ConnectionRepository():
                     "db_password": connection.db_password,
                     "db_name": connection.db_name
                 }
+                db_json_schema = get_db_schema(connection_string=None, schema_name=None, **db_config)
 
-            db_json_schema = get_db_schema(connection_string=None, schema_name=None, **db_config)
             connection.db_schema = json.dumps(db_json_schema, indent=2)
+            self._save_catalog(connection, db_json_schema)
             self.db.add(connection)
             self.db.commit()
+            # Reopen pooled target connections so they see the new schema and statistics
+            dispose_target_engine(connection.id)
             return True
         except Exception as e:
-            pass
+            self.db.rollback()
+            raise
+
+    def _save_catalog(self, connection: Connection, db_json_schema: dict):
+        """Replace the normalized schema catalog of a connection with a freshly inspected schema"""
+        self.db.query(SchemaColumn).filter(SchemaColumn.connection_id == connection.id).delete()
+        self.db.query(SchemaTable).filter(SchemaTable.connection_id == connection.id).delete()
+        self.db.query(SchemaConstraint).filter(SchemaConstraint.connection_id == connection.id).delete()
+
+        tables = [value for key, value in db_json_schema.items() if key.startswith("table_")]
+        for table_position, table in enumerate(tables):
+            schema_table = SchemaTable(connection_id=connection.id, table_name=table["table_name"],
+                                       table_name_lower=table["table_name"].lower(), position=table_position)
+            schema_table.columns = [
+                SchemaColumn(connection_id=connection.id, column_name=column_name,
+                             column_name_lower=column_name.lower(), data_type=data_type, position=column_position)
+                for column_position, (column_name, data_type) in enumerate(table["columns"].items())
+            ]
+            self.db.add(schema_table)
+
+        for constraint in db_json_schema.get("constraints", []):
+            references = constraint.get("references") or {}
+            self.db.add(SchemaConstraint(
+                connection_id=connection.id,
+                constraint_type=constraint["type"],
+                table_name=constraint["table"],
+                column_name=constraint["column"],
+                referenced_table=references.get("table"),
+                referenced_column=references.get("column")
+            ))
+
+    def _backfill_catalog(self, connection: Connection):
+        """Build the catalog from the stored JSON schema of connections connected before it existed"""
+        if not connection.db_schema:
+            return
+        if self.db.query(SchemaTable.id).filter(SchemaTable.connection_id == connection.id).first():
+            return
+        self._save_catalog(connection, json.loads(connection.db_schema))
+        self.db.commit()
+
+    def search_schema(self, id: int, table: str = None, column: str = None, match: str = "prefix",
+                      offset: int = 0, limit: int = 50):
+        """Page through the schema catalog of a connection.
+
+        `table` matches table names and `column` matches tables having such a column,
+        case-insensitively. `match` is "exact" or "prefix", both served by the name
+        indexes, or "contains", which has to scan the connection's rows. Returns
+        (total, tables) where each table has its columns and constraints loaded.
+        """
+        connection = self.db.query(Connection).filter(Connection.id == id).first()
+        if not connection:
+            raise NoResultFound
+        self._backfill_catalog(connection)
+
+        query = self.db.query(SchemaTable).filter(SchemaTable.connection_id == id)
+        if table:
+            query = query.filter(_name_filter(SchemaTable.table_name_lower, table, match))
+        if column:
+            matching_tables = self.db.query(SchemaColumn.table_id).filter(
+                SchemaColumn.connection_id == id, _name_filter(SchemaColumn.column_name_lower, column, match))
+            query = query.filter(SchemaTable.id.in_(matching_tables))
+
+        total = query.count()
+        tables = query.order_by(SchemaTable.position).offset(offset).limit(limit).all()
+
+        # Load columns and constraints of the page in two queries instead of one per table
+        table_ids = [t.id for t in tables]
+        columns = {}
+        for schema_column in self.db.query(SchemaColumn).filter(SchemaColumn.table_id.in_(table_ids)).order_by(
+                SchemaColumn.table_id, SchemaColumn.position):
+            columns.setdefault(schema_column.table_id, []).append(schema_column)
+        constraints = {}
+        for constraint in self.db.query(SchemaConstraint).filter(
+                SchemaConstraint.connection_id == id,
+                SchemaConstraint.table_name.in_([t.table_name for t in tables])):
+            constraints.setdefault(constraint.table_name, []).append(constraint)
+
+        return total, [{
+            "table_name": t.table_name,
+            "columns": columns.get(t.id, []),
+            "constraints": constraints.get(t.table_name, [])
+        } for t in tables]
+
+
+def _name_filter(column, value: str, match: str):
+    """Case-insensitive name match on a lower-cased, indexed column"""
+    value = value.lower()
+    if match == "exact":
+        return column == value
+    if match == "prefix":
+        # A range instead of LIKE, so a plain index serves it on every database
+        return column.between(value, value + "\U0010ffff")
+    escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.like(f"%{escaped}%", escape="\\")
@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 
 class InferenceProviderAbstractClass(ABC):
+    provider_type = None  # InferenceProviderType of the concrete adapter
+
     def __init__(self, api_key: str = None, **kwargs):
         self.api_key = api_key
         self.config = kwargs
+        self.stop_sequences = kwargs.get("stop_sequences")
 
     @abstractmethod
     def set_model(self, model_name: str = None):
@@ -18,6 +22,19 @@ class InferenceProviderAbstractClass(ABC):
     def set_user_prompt(self, user_prompt: str = None):
         pass
 
+    def set_stop_sequences(self, stop_sequences: list = None):
+        """Sequences at which generation stops, for providers that support them"""
+        self.stop_sequences = stop_sequences
+        return self
+
     @abstractmethod
     def get_response(self) -> str:
         pass
+
+    def get_response_stream(self) -> Iterator[str]:
+        """Yield the response text in chunks as it is generated.
+
+        Adapters without streaming support yield the full response as one chunk.
+        Closing the generator must stop reading from the provider.
+        """
+        yield self.get_response()
@@ -1,9 +1,12 @@
 from openai import OpenAI
 from google.genai import types
 from providers.abstract import InferenceProviderAbstractClass
+from providers.providertypes import InferenceProviderType
 
 
 class AWSBedrockAdapter(InferenceProviderAbstractClass):
+    provider_type = InferenceProviderType.BEDROCK
+
     def __init__(self, api_key=None, **kwargs):
         super().__init__(api_key, **kwargs)
         self.client = OpenAI(
@@ -31,8 +34,28 @@ class AWSBedrockAdapter(InferenceProviderAbstractClass):
                     {"role": "system", "content": self.system_prompt},
                     {"role": "user", "content": self.user_prompt}
                 ],
-                temperature=0.1
+                temperature=0.1,
+                stop=self.stop_sequences
             )
             return self.response.choices[0].message.content.strip()
         except Exception as e:
             raise e
+
+    def get_response_stream(self):
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": self.user_prompt}
+            ],
+            temperature=0.1,
+            stop=self.stop_sequences,
+            stream=True
+        )
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Closes the HTTP response so the provider stops generating
+            stream.close()
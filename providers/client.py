@@ -1,17 +1,54 @@
 from providers.abstract import InferenceProviderAbstractClass
+from providers.scheduler import ProviderScheduler, estimate_tokens
+from providers.streaming import read_until, StreamCancelledError
 
 
 class InferenceProviderClient:
     """Main client class for interacting with LLMs"""
 
-    def __init__(self, provider: InferenceProviderAbstractClass):
+    def __init__(self, provider: InferenceProviderAbstractClass, scheduler: ProviderScheduler = None):
         self.provider = provider
+        self.scheduler = scheduler
 
     def ask(self, model_name: str, system_prompt: str, user_prompt: str, **kwargs) -> str:
-        """Send a chat request to the LLM"""
-        try:
-            response = self.provider.set_model(model_name).set_system_prompt(
-                system_prompt).set_user_prompt(user_prompt).get_response()
-            return response
-        except Exception as e:
-            return e
+        """Send a chat request to the LLM.
+
+        With `stream=True` the response is streamed and reading stops as soon as one
+        of `stop_sequences` arrives; the returned text ends with that sequence.
+        Setting the optional `cancelled` threading.Event abandons the call: it leaves
+        the admission queue, is not sent to the provider, or its stream is closed.
+        When a scheduler is configured the call goes through its admission queue and
+        rate limits; `priority` and `timeout` kwargs are passed on to it. An
+        `on_admitted` callback is called right before the provider is called.
+        """
+        stop_sequences = kwargs.get("stop_sequences")
+        self.provider.set_model(model_name).set_system_prompt(system_prompt).set_user_prompt(
+            user_prompt).set_stop_sequences(stop_sequences)
+        if kwargs.get("stream"):
+            def complete():
+                return read_until(self.provider.get_response_stream(), stop_sequences, kwargs.get("cancelled"))
+        else:
+            complete = self.provider.get_response
+
+        on_admitted = kwargs.get("on_admitted")
+        cancelled = kwargs.get("cancelled")
+        if on_admitted is not None or cancelled is not None:
+            call_provider = complete
+
+            def complete():
+                # Runs once admitted: a call cancelled while queued never reaches the provider
+                if cancelled is not None and cancelled.is_set():
+                    raise StreamCancelledError("Call cancelled before it was sent to the provider")
+                if on_admitted is not None:
+                    on_admitted()
+                return call_provider()
+
+        if self.scheduler is None:
+            return complete()
+
+        provider_name = self.provider.provider_type.value if self.provider.provider_type else \
+            type(self.provider).__name__
+        return self.scheduler.submit(provider_name, self.provider.model, complete,
+                                     tokens=estimate_tokens(system_prompt, user_prompt),
+                                     priority=kwargs.get("priority", 10), timeout=kwargs.get("timeout"),
+                                     cancelled=cancelled)
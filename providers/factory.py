@@ -1,6 +1,7 @@
 from providers.providertypes import InferenceProviderType
 from providers.google_gemini_adapter import GoogleGeminiAdapter
 from providers.aws_bedrock_adapter import AWSBedrockAdapter
+from providers.stub_adapter import StubAdapter
 from providers.abstract import InferenceProviderAbstractClass
 
 
@@ -9,7 +10,8 @@ class InferenceProviderFactory:
 
     _providers = {
         InferenceProviderType.GEMINI: GoogleGeminiAdapter,
-        InferenceProviderType.BEDROCK: AWSBedrockAdapter
+        InferenceProviderType.BEDROCK: AWSBedrockAdapter,
+        InferenceProviderType.STUB: StubAdapter
     }
 
     @classmethod
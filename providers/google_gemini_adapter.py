@@ -1,9 +1,12 @@
 from google import genai
 from google.genai import types
 from providers.abstract import InferenceProviderAbstractClass
+from providers.providertypes import InferenceProviderType
 
 
 class GoogleGeminiAdapter(InferenceProviderAbstractClass):
+    provider_type = InferenceProviderType.GEMINI
+
     def __init__(self, api_key=None, **kwargs):
         super().__init__(api_key, **kwargs)
         self.client = genai.Client(api_key=self.api_key)
@@ -20,13 +23,30 @@ class GoogleGeminiAdapter(InferenceProviderAbstractClass):
         self.user_prompt = user_prompt
         return self
 
+    def _generation_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(system_instruction=self.system_prompt, temperature=0.1,
+                                           stop_sequences=self.stop_sequences)
+
     def get_response(self) -> str:
         try:
             self.response = self.client.models.generate_content(
                 model=self.model,
-                config=types.GenerateContentConfig(system_instruction=self.system_prompt, temperature=0.1),
+                config=self._generation_config(),
                 contents=self.user_prompt
             )
             return self.response.text.strip()
         except Exception as e:
             raise e
+
+    def get_response_stream(self):
+        stream = self.client.models.generate_content_stream(
+            model=self.model,
+            config=self._generation_config(),
+            contents=self.user_prompt
+        )
+        try:
+            for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            stream.close()
@@ -0,0 +1,236 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from providers.abstract import InferenceProviderAbstractClass
+from providers.client import InferenceProviderClient
+from providers.factory import InferenceProviderFactory
+from providers.providertypes import InferenceProviderType
+from providers.scheduler import ProviderScheduler, SchedulerError, RateLimitExceededError
+from providers.streaming import StreamCancelledError
+
+
+class ProviderTarget:
+    """A provider/model pair the hedged adapter can send requests to"""
+
+    def __init__(self, provider_type: InferenceProviderType, model_name: str = None, **kwargs):
+        self.provider_type = provider_type
+        self.model_name = model_name
+        self.kwargs = kwargs  # Passed to InferenceProviderFactory.create (api_key, base_url, ...)
+
+    @property
+    def key(self) -> str:
+        return f"{self.provider_type.value}/{self.model_name}"
+
+
+class ProviderHealthTracker:
+    """Rolling latency window and circuit-breaker style health per provider target"""
+
+    def __init__(self, window_size: int = 200, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.window_size = window_size
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._failures = {}
+        self._unhealthy_until = {}
+        self._requests = 0
+        self._hedges = 0
+
+    def record_request(self):
+        with self._lock:
+            self._requests += 1
+
+    def try_hedge(self, max_ratio: float) -> bool:
+        """Take a hedge from the budget if fewer than max_ratio of all requests were hedged"""
+        with self._lock:
+            if self._hedges + 1 > max_ratio * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def record_success(self, key: str, latency: float):
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=self.window_size)).append(latency)
+            self._failures[key] = 0
+            self._unhealthy_until.pop(key, None)
+
+    def record_failure(self, key: str):
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] >= self.failure_threshold:
+                self._unhealthy_until[key] = time.monotonic() + self.cooldown
+
+    def is_healthy(self, key: str) -> bool:
+        # After the cooldown the target is tried again; one more failure re-opens the breaker
+        with self._lock:
+            return time.monotonic() >= self._unhealthy_until.get(key, 0)
+
+    def percentile(self, key: str, percentile: float, min_samples: int = 5):
+        """Latency at the given percentile (0-1), or None while there are too few samples"""
+        with self._lock:
+            samples = sorted(self._latencies.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = set(self._latencies) | set(self._failures)
+        targets = {key: {"healthy": self.is_healthy(key),
+                         "consecutive_failures": self._failures.get(key, 0),
+                         "p50": self.percentile(key, 0.5, min_samples=1),
+                         "p95": self.percentile(key, 0.95, min_samples=1)} for key in sorted(keys)}
+        return {"requests": self._requests, "hedges": self._hedges, "targets": targets}
+
+
+def is_local_error(error: Exception) -> bool:
+    """Admission errors raised by our own scheduler, which say nothing about the provider"""
+    return isinstance(error, SchedulerError) and not isinstance(error, RateLimitExceededError)
+
+
+# Shared across requests so latency history and health survive per-request adapters
+default_health_tracker = ProviderHealthTracker()
+
+ADMISSION_POLL_INTERVAL = 0.05  # Seconds between checks whether the primary has been admitted
+
+
+class HedgedProviderAdapter(InferenceProviderAbstractClass):
+    """Composite provider that hedges slow requests and fails over between targets.
+
+    The first healthy target is called first. If it has not answered within its
+    rolling latency percentile (hedge_percentile) after being admitted by the
+    scheduler, a hedged request is sent to the next healthy target and whichever
+    answers first wins. The other request is cancelled if it has not started yet,
+    its stream is closed if it is streaming, otherwise its result is discarded.
+    Hedging is skipped while the scheduler has calls waiting and is limited to
+    max_hedge_ratio of all requests. A target that errors is failed over to the
+    next one immediately, and targets that keep failing are skipped until their
+    cooldown passes. Local admission errors (queue full, deadline) are raised as
+    is, without failover.
+    """
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.targets = kwargs.get("targets", [])
+        self.tracker = kwargs.get("tracker") or default_health_tracker
+        self.scheduler: ProviderScheduler = kwargs.get("scheduler")
+        self.hedge_percentile = kwargs.get("hedge_percentile", 0.95)
+        self.initial_hedge_delay = kwargs.get("initial_hedge_delay", 2.0)  # Used until enough samples exist
+        self.min_hedge_delay = kwargs.get("min_hedge_delay", 0.05)
+        self.max_hedges = kwargs.get("max_hedges", 1)
+        self.max_hedge_ratio = kwargs.get("max_hedge_ratio", 0.1)  # Share of requests that may be hedged
+        if not self.targets:
+            raise ValueError("HedgedProviderAdapter requires at least one target")
+
+    def set_model(self, model_name=None):
+        # Models are configured per target; the composite only reports the primary one
+        self.model = self.targets[0].model_name if model_name is None else model_name
+        return self
+
+    def set_system_prompt(self, system_prompt=None):
+        self.system_prompt = system_prompt
+        return self
+
+    def set_user_prompt(self, user_prompt=None):
+        self.user_prompt = user_prompt
+        return self
+
+    def _call(self, target: ProviderTarget, stream: bool, state: dict) -> str:
+        provider = InferenceProviderFactory.create(target.provider_type, **target.kwargs)
+        client = InferenceProviderClient(provider, scheduler=self.scheduler)
+
+        def on_admitted():
+            # Latency and the hedge timer exclude time spent in the admission queue
+            state["admitted_at"] = time.monotonic()
+
+        try:
+            response = client.ask(model_name=target.model_name, system_prompt=self.system_prompt,
+                                  user_prompt=self.user_prompt, stream=stream,
+                                  stop_sequences=self.stop_sequences, on_admitted=on_admitted,
+                                  cancelled=state["cancelled"])
+        except Exception as e:
+            if not is_local_error(e) and not isinstance(e, StreamCancelledError):
+                self.tracker.record_failure(target.key)
+            raise
+        self.tracker.record_success(target.key, time.monotonic() - state["admitted_at"])
+        return response
+
+    def _hedge_delay(self, target: ProviderTarget) -> float:
+        delay = self.tracker.percentile(target.key, self.hedge_percentile)
+        return max(self.min_hedge_delay, self.initial_hedge_delay if delay is None else delay)
+
+    def get_response(self) -> str:
+        return self._race(stream=False)
+
+    def get_response_stream(self):
+        # Each member streams and stops at the stop sequence; the winner's text is yielded whole
+        yield self._race(stream=True)
+
+    def _scheduler_busy(self) -> bool:
+        return self.scheduler is not None and self.scheduler.stats()["queued"] > 0
+
+    def _race(self, stream: bool) -> str:
+        candidates = [t for t in self.targets if self.tracker.is_healthy(t.key)] or list(self.targets)
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        pending = {}
+        hedges = 0
+        last_error = None
+        self.tracker.record_request()
+
+        def launch():
+            target = candidates.pop(0)
+            state = {"cancelled": threading.Event()}
+            pending[executor.submit(self._call, target, stream, state)] = (target, state)
+            return target, state
+
+        try:
+            primary, primary_state = launch()
+            hedge_delay = self._hedge_delay(primary)
+            while pending:
+                can_hedge = candidates and hedges < self.max_hedges
+                timeout = None
+                if can_hedge:
+                    if "admitted_at" in primary_state:
+                        timeout = max(0.0, primary_state["admitted_at"] + hedge_delay - time.monotonic())
+                    else:
+                        timeout = ADMISSION_POLL_INTERVAL  # The hedge timer starts once the primary is admitted
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    hedge_at = primary_state.get("admitted_at", float("inf")) + hedge_delay
+                    if time.monotonic() < hedge_at:
+                        continue
+                    if self._scheduler_busy() or not self.tracker.try_hedge(self.max_hedge_ratio):
+                        # Hedging would add load while overloaded or over budget: wait for the primary
+                        hedges = self.max_hedges
+                        continue
+                    # Slower than the rolling percentile: race a hedged request
+                    launch()
+                    hedges += 1
+                    continue
+
+                for future in done:
+                    pending.pop(future)
+                    if future.exception() is None:
+                        return future.result()
+                    last_error = future.exception()
+
+                if not pending and is_local_error(last_error):
+                    # Rejected by our own scheduler: another provider would not help
+                    raise last_error
+                if not pending and candidates:
+                    # Every in-flight request failed: fail over to the next target, which gets its own hedge timer
+                    primary, primary_state = launch()
+                    hedge_delay = self._hedge_delay(primary)
+                elif pending and all(state is not primary_state for _, state in pending.values()):
+                    # The primary failed while a hedge is in flight: time further hedges from that request
+                    primary, primary_state = next(iter(pending.values()))
+                    hedge_delay = self._hedge_delay(primary)
+            raise last_error
+        finally:
+            # Losers that have not started are cancelled; streaming ones stop at their next chunk
+            for future, (_, state) in pending.items():
+                future.cancel()
+                state["cancelled"].set()
+            executor.shutdown(wait=False, cancel_futures=True)
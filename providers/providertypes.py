@@ -4,3 +4,4 @@ from enum import Enum
 class InferenceProviderType(Enum):
     GEMINI = "gemini"
     BEDROCK = "bedrock"
+    STUB = "stub"
@@ -0,0 +1,222 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from providers.streaming import StreamCancelledError
+
+
+class SchedulerError(Exception):
+    """Base class for errors raised when a provider call cannot be admitted"""
+
+
+class SchedulerQueueFullError(SchedulerError):
+    """Raised immediately when the admission queue is already at capacity"""
+
+
+class SchedulerDeadlineExceededError(SchedulerError):
+    """Raised when a call could not be admitted or completed before its deadline"""
+
+
+class RateLimitExceededError(SchedulerError):
+    """Raised when the provider keeps rate limiting after all retries"""
+
+
+class RateLimit:
+    """Requests per minute and tokens per minute allowed for a provider or model"""
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at capacity per minute"""
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = float(capacity_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (0 if available now)"""
+        self._refill(now)
+        # A single request larger than the bucket is allowed once the bucket is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+# Default limits, keyed by provider type value and by (provider type value, model name)
+DEFAULT_PROVIDER_LIMITS = {
+    "gemini": RateLimit(requests_per_minute=60, tokens_per_minute=1_000_000),
+    "bedrock": RateLimit(requests_per_minute=60, tokens_per_minute=200_000),
+}
+DEFAULT_MODEL_LIMITS = {
+    ("gemini", "gemini-2.5-flash"): RateLimit(requests_per_minute=60, tokens_per_minute=1_000_000),
+}
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Rough token estimate (~4 characters per token) used for admission"""
+    return sum(len(t or "") for t in texts) // 4 + 1
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect 429 / quota errors raised by the Gemini and OpenAI (Bedrock) SDKs.
+
+    Relies on the status attributes and error type, not on digits in the message:
+    e.g. "input token count (1429301) exceeds the maximum" is a 400, not a 429.
+    """
+    for attr in ("status_code", "code", "status"):
+        if getattr(error, attr, None) in (429, "429", "RESOURCE_EXHAUSTED"):
+            return True
+    if type(error).__name__ == "RateLimitError":
+        return True
+    return "RESOURCE_EXHAUSTED" in str(error)
+
+
+CANCEL_POLL_INTERVAL = 0.1  # Seconds between checks of a waiting call's cancellation event
+
+
+class _Ticket:
+    def __init__(self, buckets, tokens, deadline):
+        self.buckets = buckets
+        self.tokens = tokens
+        self.deadline = deadline
+
+
+class ProviderScheduler:
+    """Admission control in front of inference provider calls.
+
+    Calls wait in a priority queue per provider/model (lower number = higher
+    priority) until the token buckets of their provider and model can admit them.
+    The total number of waiting calls is bounded: a call is rejected right away when
+    the queues are full and fails once its deadline passes.
+    Rate limit errors from the provider are retried with jittered exponential
+    backoff, going back through the queue each time.
+    """
+
+    def __init__(self, provider_limits: dict = None, model_limits: dict = None, max_queue_size: int = 100,
+                 default_timeout: float = 60.0, max_retries: int = 3, backoff_base: float = 1.0,
+                 backoff_max: float = 20.0):
+        self.provider_limits = DEFAULT_PROVIDER_LIMITS if provider_limits is None else provider_limits
+        self.model_limits = DEFAULT_MODEL_LIMITS if model_limits is None else model_limits
+        self.max_queue_size = max_queue_size
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._cond = threading.Condition()
+        self._queues = {}  # (provider, model) -> heap of waiting entries
+        self._queued = 0
+        self._counter = itertools.count()
+        self._buckets = {}
+        self._stats = {"admitted": 0, "rejected": 0, "expired": 0, "retried": 0, "cancelled": 0}
+
+    def _buckets_for(self, provider: str, model: str) -> list:
+        buckets = []
+        for key, limit in ((provider, self.provider_limits.get(provider)),
+                           ((provider, model), self.model_limits.get((provider, model)))):
+            if limit is None:
+                continue
+            for unit, capacity in (("requests", limit.requests_per_minute), ("tokens", limit.tokens_per_minute)):
+                if capacity:
+                    bucket_key = (key, unit)
+                    if bucket_key not in self._buckets:
+                        self._buckets[bucket_key] = TokenBucket(capacity)
+                    buckets.append((self._buckets[bucket_key], 1 if unit == "requests" else None))
+        return buckets
+
+    def _admit(self, provider: str, model: str, tokens: int, priority: int, deadline: float,
+               cancelled: threading.Event = None):
+        with self._cond:
+            if self._queued >= self.max_queue_size:
+                self._stats["rejected"] += 1
+                raise SchedulerQueueFullError(f"Admission queue for inference providers is full "
+                                              f"({self.max_queue_size} waiting)")
+
+            # One heap per provider/model, so a throttled provider never blocks another one
+            queue = self._queues.setdefault((provider, model), [])
+            ticket = _Ticket(self._buckets_for(provider, model), tokens, deadline)
+            entry = (priority, next(self._counter), ticket)
+            heapq.heappush(queue, entry)
+            self._queued += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now >= deadline:
+                        self._stats["expired"] += 1
+                        raise SchedulerDeadlineExceededError(f"Deadline exceeded waiting for {provider}/{model}")
+                    if cancelled is not None and cancelled.is_set():
+                        # Abandoned while queued (e.g. a losing hedge): free the slot without using capacity
+                        self._stats["cancelled"] += 1
+                        raise StreamCancelledError(f"Call to {provider}/{model} cancelled while queued")
+
+                    wait = None
+                    if queue[0] is entry:
+                        wait = max((bucket.wait_time(amount or tokens, now) for bucket, amount in ticket.buckets),
+                                   default=0.0)
+                        if wait == 0.0:
+                            for bucket, amount in ticket.buckets:
+                                bucket.take(amount or tokens)
+                            self._stats["admitted"] += 1
+                            return
+
+                    timeout = deadline - now if wait is None else min(wait, deadline - now)
+                    if cancelled is not None:
+                        timeout = min(timeout, CANCEL_POLL_INTERVAL)
+                    self._cond.wait(timeout)
+            finally:
+                queue.remove(entry)
+                heapq.heapify(queue)
+                self._queued -= 1
+                if not queue:
+                    del self._queues[(provider, model)]
+                self._cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform between 0 and the capped exponential delay
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def submit(self, provider: str, model: str, fn, *args, tokens: int = 1, priority: int = 10,
+               timeout: float = None, cancelled: threading.Event = None, **kwargs):
+        """Run fn(*args, **kwargs) once admitted, retrying on provider rate limit errors.
+
+        Setting `cancelled` removes a waiting call from the queue (StreamCancelledError).
+        """
+        deadline = time.monotonic() + (self.default_timeout if timeout is None else timeout)
+        attempt = 0
+        while True:
+            self._admit(provider, model, tokens, priority, deadline, cancelled)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                if attempt >= self.max_retries:
+                    raise RateLimitExceededError(f"{provider}/{model} is rate limited: {e}") from e
+                delay = self._backoff(attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise SchedulerDeadlineExceededError(f"Deadline exceeded retrying {provider}/{model}") from e
+                with self._cond:
+                    self._stats["retried"] += 1
+                attempt += 1
+                if cancelled is not None:
+                    cancelled.wait(delay)  # The next _admit raises if it was cancelled during the backoff
+                else:
+                    time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return dict(self._stats, queued=self._queued)
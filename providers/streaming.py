@@ -0,0 +1,33 @@
+import threading
+from typing import Iterable
+
+
+class StreamCancelledError(Exception):
+    """Raised when a stream is abandoned because its result is no longer needed"""
+
+
+def read_until(chunks: Iterable[str], stop_sequences: list = None, cancelled: threading.Event = None) -> str:
+    """Consume a response stream until one of stop_sequences appears.
+
+    Returns the text up to and including the first stop sequence and closes the
+    stream so no further output is read (or paid for). If no stop sequence shows
+    up, the whole stream is returned. Setting `cancelled` closes the stream at the
+    next chunk and raises StreamCancelledError.
+    """
+    text = ""
+    try:
+        for chunk in chunks:
+            if cancelled is not None and cancelled.is_set():
+                raise StreamCancelledError("Stream cancelled")
+            searched_from = max(0, len(text) - max((len(s) for s in stop_sequences or []), default=0))
+            text += chunk
+            matches = [(text.find(stop, searched_from), stop) for stop in stop_sequences or []]
+            matches = [(index, stop) for index, stop in matches if index != -1]
+            if matches:
+                index, stop = min(matches)
+                return text[:index + len(stop)]
+        return text
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,54 @@
+import random
+import time
+from providers.abstract import InferenceProviderAbstractClass
+from providers.providertypes import InferenceProviderType
+
+
+class StubAdapter(InferenceProviderAbstractClass):
+    """Local adapter returning a canned response, for testing without a real LLM.
+
+    kwargs:
+        response: text returned by get_response
+        latency: seconds to sleep before answering
+        jitter: extra random latency, uniform between 0 and jitter seconds
+        error_rate: probability (0-1) of raising instead of answering
+        chunk_size: characters per chunk when streaming (latency is spread across chunks)
+
+    Stop sequences are ignored, like a provider without stop sequence support.
+    """
+    provider_type = InferenceProviderType.STUB
+
+    def __init__(self, api_key=None, **kwargs):
+        super().__init__(api_key, **kwargs)
+        self.response = kwargs.get("response", "<sql>SELECT 1</sql>")
+        self.latency = kwargs.get("latency", 0.0)
+        self.jitter = kwargs.get("jitter", 0.0)
+        self.error_rate = kwargs.get("error_rate", 0.0)
+        self.chunk_size = kwargs.get("chunk_size", 8)
+
+    def set_model(self, model_name=None):
+        self.model = "stub" if model_name is None else model_name
+        return self
+
+    def set_system_prompt(self, system_prompt=None):
+        self.system_prompt = system_prompt
+        return self
+
+    def set_user_prompt(self, user_prompt=None):
+        self.user_prompt = user_prompt
+        return self
+
+    def get_response(self) -> str:
+        time.sleep(self.latency + random.uniform(0, self.jitter))
+        if random.random() < self.error_rate:
+            raise RuntimeError(f"Stub provider {self.model} failed")
+        return self.response
+
+    def get_response_stream(self):
+        chunks = [self.response[i:i + self.chunk_size] for i in range(0, len(self.response), self.chunk_size)]
+        delay = (self.latency + random.uniform(0, self.jitter)) / max(1, len(chunks))
+        for chunk in chunks:
+            time.sleep(delay)
+            if random.random() < self.error_rate / len(chunks):
+                raise RuntimeError(f"Stub provider {self.model} failed")
+            yield chunk
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from database import models, repositories
+from database.engines import get_target_engine
 from sqlalchemy.orm import Session
 from routes.models import *
 import utilities
-from sqlalchemy import create_engine
 from sqlalchemy import text
 from providers.client import InferenceProviderClient
 from providers.providertypes import InferenceProviderType
-from providers.factory import InferenceProviderFactory
+from providers.hedged_adapter import HedgedProviderAdapter, ProviderTarget, default_health_tracker
+from providers.scheduler import ProviderScheduler, SchedulerQueueFullError, SchedulerDeadlineExceededError, \
+    RateLimitExceededError
+from singleflight import SingleFlight, normalize_question
+from summaries import summarize_result
 import os
 from dotenv import load_dotenv
 
@@ -16,6 +20,13 @@ load_dotenv()
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+# Concurrent identical requests share a single LLM call / query execution
+llm_flight = SingleFlight("llm")
+sql_flight = SingleFlight("sql")
+
+# Shared admission control and rate limiting for all inference provider calls
+provider_scheduler = ProviderScheduler()
+
 
 @router.post("/")
 def chat(request_payload: ChatRequest, db: Session = Depends(models.get_db)):
@@ -23,6 +34,69 @@ def chat(request_payload: ChatRequest, db: Session = Depends(models.get_db)):
     connection_id = request_payload.connection_id
     repository = repositories.ConnectionRepository(db)
     connection = repository.find(connection_id)
+
+    # Step 1 & 2: Generate SQL from user query, coalesced by (connection, question)
+    try:
+        sql_query = llm_flight.do((connection_id, normalize_question(user_question)),
+                                  generate_sql, connection, user_question)
+    except SchedulerQueueFullError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={
+            "error": "Service Unavailable",
+            "message": str(e)
+        }, headers={"Retry-After": "5"})
+    except SchedulerDeadlineExceededError as e:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail={
+            "error": "Gateway Timeout",
+            "message": str(e)
+        })
+    except RateLimitExceededError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail={
+            "error": "Too Many Requests",
+            "message": str(e)
+        }, headers={"Retry-After": "30"})
+
+    # Step 3: Basic SQL validation
+    is_safe_sql = utilities.is_safe_sql(sql_query)
+
+    if not is_safe_sql:
+        raise ValueError("Unsafe SQL detected.")
+
+    # Step 4: Execute query, coalesced by (connection, SQL)
+    column_names, rows = sql_flight.do((connection_id, sql_query), execute_query, connection, sql_query)
+
+    # Step 5: Either summarize the result for charts or return every row
+    if request_payload.response_mode == "summary":
+        try:
+            summary = summarize_result(column_names, rows, x_column=request_payload.x_column,
+                                       max_points=request_payload.max_points, method=request_payload.downsample)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={
+                "error": "Invalid x_column",
+                "message": str(e)
+            })
+        return {"query": sql_query, "summary": summary}
+
+    return {"query": sql_query, "results": [dict(zip(column_names, row)) for row in rows]}
+
+
+@router.get("/metrics")
+def chat_metrics():
+    return {"coalescing": [llm_flight.stats(), sql_flight.stats()], "scheduler": provider_scheduler.stats(),
+            "providers": default_health_tracker.stats()}
+
+
+def provider_targets() -> list:
+    # Gemini is the primary target; Bedrock is used for hedging/failover when configured
+    targets = [ProviderTarget(InferenceProviderType.GEMINI, "gemini-2.5-flash",
+                              api_key=os.getenv("GOOGLE_GEMINI_API_KEY"))]
+    if os.getenv("AWS_BEDROCK_API_KEY"):
+        targets.append(ProviderTarget(InferenceProviderType.BEDROCK, "openai.gpt-oss-20b-1:0",
+                                      api_key=os.getenv("AWS_BEDROCK_API_KEY"),
+                                      base_url=os.getenv("AWS_BEDROCK_BASE_URL")))
+    return targets
+
+
+def generate_sql(connection: models.Connection, user_question: str) -> str:
     db_schema = connection.db_schema  # Used in system prompt
 
     # Step 1: Generate SQL from user query
@@ -48,58 +122,26 @@ def chat(request_payload: ChatRequest, db: Session = Depends(models.get_db)):
             Use following Database Schema to create the SQL query: {db_schema}
         """
 
-    provider = InferenceProviderFactory.create(
-        InferenceProviderType.GEMINI, api_key=os.getenv("GOOGLE_GEMINI_API_KEY"))
-
-    # provider = InferenceProviderFactory.create(
-    #     InferenceProviderType.BEDROCK, api_key=os.getenv("AWS_BEDROCK_API_KEY"), base_url=os.getenv("AWS_BEDROCK_BASE_URL"))
-    # openai.gpt-oss-20b-1:0
-
+    provider = HedgedProviderAdapter(targets=provider_targets(), scheduler=provider_scheduler)
     client = InferenceProviderClient(provider)
 
     # Step 1: Use AI service to convert question in Natural Language to SQL
-    response = client.ask(model_name="gemini-2.5-flash", system_prompt=system_prompt, user_prompt=user_question)
+    # The response is streamed and reading stops at the closing </sql> tag
+    response = client.ask(model_name=None, system_prompt=system_prompt, user_prompt=user_question,
+                          stream=True, stop_sequences=["</sql>"])
 
     # Step 2: Extract SQL query from the LLM response
-    sql_query = utilities.query_extractor(response)
-
-    # Step 3: Basic SQL validation
-    is_safe_sql = utilities.is_safe_sql(sql_query)
+    return utilities.query_extractor(response)
 
-    if not is_safe_sql:
-        raise ValueError("Unsafe SQL detected.")
 
-    # Connect with target database
-    # Build connection string based on database type
-    db_type = connection.db_type
-
-    if db_type == 'mysql':
-        driver = 'pymysql'  # or 'mysqlconnector'
-        connection_string = f"mysql+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
-    elif db_type == 'postgresql':
-        driver = 'psycopg2'
-        connection_string = f"postgresql+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
-    elif db_type == 'sqlite':
-        connection_string = f"sqlite:///./{connection.db_name}.db"
-    elif db_type == 'mssql':
-        driver = 'pymssql'
-        connection_string = f"mssql+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
-    elif db_type == 'oracle':
-        driver = 'cx_oracle'
-        connection_string = f"oracle+{driver}://{connection.db_username}:{connection.db_password}@{connection.db_host}:{connection.db_port}/{connection.db_name}"
-    else:
-        raise ValueError(f"Unsupported database type: {db_type}")
-
-    # Create engine
-    engine = create_engine(connection_string)
-
-    # Step 4: Execute query
-    rows = []
+def execute_query(connection: models.Connection, sql_query: str) -> tuple:
+    # Pooled engine of the target database (read-only for SQLite)
+    engine = get_target_engine(connection)
 
+    # Step 4: Execute query, returning column names and plain row tuples
     with engine.connect() as conn:
         result = conn.execute(text(sql_query))
-        # rows = [dict(r) for r in result]
-        for row in result:
-            rows.append(dict(row._mapping))
+        column_names = list(result.keys())
+        rows = [tuple(row) for row in result]
 
-    return {"query": sql_query, "results": rows}
+    return column_names, rows
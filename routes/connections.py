@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from database import models, repositories
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 import json
 from routes.models import *
 from database.repositories import ConnectionRepository
@@ -56,6 +56,23 @@ def get_connection_detail(connection_id: int, db: Session = Depends(models.get_d
     return connection
 
 
+@router.get("/{connection_id}/schema", response_model=SchemaSearchResponse)
+def search_connection_schema(connection_id: int, table: Optional[str] = None, column: Optional[str] = None,
+                             match: Literal["exact", "prefix", "contains"] = "prefix",
+                             offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500),
+                             db: Session = Depends(models.get_db)):
+    repository = ConnectionRepository(db)
+    try:
+        total, tables = repository.search_schema(connection_id, table=table, column=column, match=match,
+                                                 offset=offset, limit=limit)
+    except NoResultFound as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={
+            "error": "Not Found",
+            "message": f"Connection not found"
+        })
+    return {"total": total, "offset": offset, "limit": limit, "tables": tables}
+
+
 @router.delete("/{connection_id}", response_model=ConnectionDeleteResponse)
 def delete_connection(connection_id: int, db: Session = Depends(models.get_db)):
     repository = ConnectionRepository(db)
@@ -77,7 +94,7 @@ def establish_connection(request_payload: ConnectionTestRequest, db: Session = D
     connection_id = request_payload.connection_id
     repository = ConnectionRepository(db)
     try:
-        repository.connect(connection_id)
+        repository.connect(connection_id, analyze=request_payload.analyze)
     except NoResultFound as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={
             "error": "Not Found",
@@ -1,11 +1,15 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 from datetime import datetime
 
 
 class ChatRequest(BaseModel):
     question: str
     connection_id: int
+    response_mode: Literal["rows", "summary"] = "rows"  # "summary" returns column stats and downsampled series
+    x_column: Optional[str] = None  # X axis of the downsampled series (summary mode)
+    max_points: int = Field(1000, ge=3, le=100000)  # Points per downsampled series (summary mode)
+    downsample: Literal["lttb", "bucket"] = "lttb"
 
 
 class AddConnectionRequest(BaseModel):
@@ -46,6 +50,7 @@ class ConnectionDetailResponse(BaseModel):
 
 class ConnectionTestRequest(BaseModel):
     connection_id: int
+    analyze: bool = False  # Run ANALYZE on SQLite databases so the query planner has statistics
 
 
 class ConnectionTestResponse(BaseModel):
@@ -56,3 +61,29 @@ class ConnectionTestResponse(BaseModel):
 class ConnectionDeleteResponse(BaseModel):
     success: bool
     message: str
+
+
+class SchemaColumnResponse(BaseModel):
+    column_name: str
+    data_type: str
+    position: int
+
+
+class SchemaConstraintResponse(BaseModel):
+    constraint_type: str
+    column_name: str
+    referenced_table: Optional[str] = None
+    referenced_column: Optional[str] = None
+
+
+class SchemaTableResponse(BaseModel):
+    table_name: str
+    columns: List[SchemaColumnResponse]
+    constraints: List[SchemaConstraintResponse]
+
+
+class SchemaSearchResponse(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    tables: List[SchemaTableResponse]
@@ -0,0 +1,103 @@
+import copy
+import threading
+
+
+class _Call:
+    """A single in-flight call whose result is shared with duplicate callers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving with the same
+    key while it is still running wait for it and receive the same result, or the
+    same exception. Once the call finishes the key is released, so later calls
+    run again (this is not a cache).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executed = 0
+        self._coalesced = 0
+        self._failed = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) once for all concurrent callers using key"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise _copy_error(call.error) from call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        """Return counters describing how many calls were executed and coalesced"""
+        with self._lock:
+            return {
+                "name": self.name,
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+                "failed": self._failed,
+                "in_flight": len(self._calls)
+            }
+
+
+def _copy_error(error: BaseException) -> BaseException:
+    """A fresh exception for each waiter, so threads don't share (and grow) one traceback"""
+    try:
+        # Pickle protocol copy keeps state set by __init__/__new__ (e.g. OSError errno and filename)
+        duplicate = copy.copy(error)
+    except Exception:
+        try:
+            # Types whose __init__ does not accept their args (e.g. HTTPException): copy the state instead
+            duplicate = type(error).__new__(type(error), *error.args)
+            duplicate.args = error.args
+            duplicate.__dict__.update(getattr(error, "__dict__", {}))
+        except Exception:
+            return SingleFlightError(f"{type(error).__name__}: {error}")
+    duplicate.__traceback__ = None
+    return duplicate
+
+
+class SingleFlightError(Exception):
+    """Raised to waiters when the leader's exception cannot be re-created"""
+
+
+def normalize_question(question: str) -> str:
+    """Collapse whitespace so trivially different duplicates share a key.
+
+    Case is kept: quoted literals such as 'ACME' and 'acme' may select different rows.
+    """
+    return " ".join(question.split())
@@ -0,0 +1,186 @@
+import datetime
+import decimal
+import re
+import numpy as np
+
+QUANTILES = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+# Strings are only treated as temporal when they look like ISO dates (YYYY-MM-DD[ HH:MM[:SS[.fff]]])
+ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+
+def _to_numeric(values: list):
+    """Convert a column to float64 (NaN for NULL) or return None if it is not numeric"""
+    non_null = [v for v in values if v is not None]
+    if not non_null or not all(isinstance(v, (int, float, decimal.Decimal)) and not isinstance(v, bool)
+                               for v in non_null):
+        return None
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _to_naive_utc(value):
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _to_datetime(values: list):
+    """Convert a date/datetime column (or ISO strings, as returned by SQLite) to datetime64[ms].
+
+    Timezone-aware datetimes are normalized to UTC, since datetime64 has no timezone.
+    """
+    non_null = [v for v in values if v is not None]
+    if not non_null:
+        return None
+    if all(isinstance(v, (datetime.date, datetime.datetime)) for v in non_null):
+        values = [None if v is None else _to_naive_utc(v).isoformat() for v in values]
+    elif not all(isinstance(v, str) and ISO_DATE_PATTERN.match(v) for v in non_null):
+        return None
+    try:
+        return np.array(["NaT" if v is None else v for v in values], dtype="datetime64[ms]")
+    except ValueError:
+        return None
+
+
+def column_summary(values: list) -> dict:
+    """Null count plus min/max/mean/quantiles for numeric and temporal columns.
+
+    NaN and +/-inf are left out of numeric stats and counted as non_finite; stats
+    of a column without any finite value are None.
+    """
+    nulls = sum(v is None for v in values)
+    summary = {"count": len(values) - nulls, "nulls": nulls}
+
+    numeric = _to_numeric(values)
+    if numeric is not None:
+        finite = numeric[np.isfinite(numeric)]
+        summary.update({"type": "numeric", "non_finite": summary["count"] - len(finite),
+                        "min": None, "max": None, "mean": None, "std": None,
+                        "quantiles": {str(q): None for q in QUANTILES}})
+        if len(finite):
+            quantiles = np.quantile(finite, QUANTILES)
+            summary.update({
+                "min": float(finite.min()),
+                "max": float(finite.max()),
+                "mean": float(finite.mean()),
+                "std": float(finite.std()),
+                "quantiles": {str(q): float(v) for q, v in zip(QUANTILES, quantiles)}
+            })
+        return summary
+
+    temporal = _to_datetime(values)
+    if temporal is not None:
+        valid = temporal[~np.isnat(temporal)]
+        summary.update({"type": "temporal", "min": str(valid.min()), "max": str(valid.max())})
+        return summary
+
+    summary.update({"type": "categorical",
+                    "distinct": len(np.unique(np.array([str(v) for v in values if v is not None])))})
+    return summary
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling; returns indices of the kept points"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept, the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        if next_start >= next_end:
+            next_x, next_y = x[-1], y[-1]
+        else:
+            next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        # Area of the triangle (previous kept point, candidate, average of next bucket) for every candidate
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        indices[i + 1] = previous
+    return indices
+
+
+def bucket_aggregate(x: np.ndarray, y: np.ndarray, n_out: int) -> dict:
+    """Split the series into n_out equally sized buckets and return per-bucket min/max/mean"""
+    n = len(x)
+    n_out = min(n_out, n)
+    starts = np.linspace(0, n, n_out, endpoint=False).astype(np.int64)
+    counts = np.diff(np.append(starts, n))
+    return {
+        "x": x[starts],
+        "mean": np.add.reduceat(y, starts) / counts,
+        "min": np.minimum.reduceat(y, starts),
+        "max": np.maximum.reduceat(y, starts)
+    }
+
+
+def summarize_result(column_names: list, rows: list, x_column: str = None, max_points: int = 1000,
+                     method: str = "lttb") -> dict:
+    """Build a chart-friendly summary of a query result instead of returning every row.
+
+    Each column gets a summary. Numeric columns are additionally downsampled to at
+    most max_points points against x_column (default: the first temporal or numeric
+    column), using LTTB or bucket min/max/mean aggregation. Raises ValueError when
+    the requested x_column is missing or neither numeric nor temporal.
+    """
+    columns = {name: [row[i] for row in rows] for i, name in enumerate(column_names)}
+    response = {
+        "row_count": len(rows),
+        "columns": {name: column_summary(values) for name, values in columns.items()},
+        "series": None
+    }
+    if x_column is not None:
+        if x_column not in columns:
+            raise ValueError(f"Column '{x_column}' is not in the query result")
+        if rows and response["columns"][x_column]["type"] not in ("temporal", "numeric"):
+            raise ValueError(f"Column '{x_column}' is neither numeric nor temporal and cannot be used as x axis")
+    if not rows:
+        return response
+
+    if x_column is None:
+        x_column = next((name for name, summary in response["columns"].items()
+                         if summary["type"] in ("temporal", "numeric")), None)
+        if x_column is None:
+            return response
+
+    x_temporal = response["columns"][x_column]["type"] == "temporal"
+    if x_temporal:
+        timestamps = _to_datetime(columns[x_column])
+        x = timestamps.astype(np.int64).astype(np.float64)
+        x[np.isnat(timestamps)] = np.nan
+    else:
+        x = _to_numeric(columns[x_column])
+    valid = np.isfinite(x)
+    order = np.argsort(x[valid], kind="stable")
+    x = x[valid][order]
+
+    def format_x(values):
+        if x_temporal:
+            return [str(v) for v in values.astype(np.int64).astype("datetime64[ms]")]
+        return values.tolist()
+
+    series = {}
+    for name, values in columns.items():
+        if name == x_column or response["columns"][name]["type"] != "numeric":
+            continue
+        y = _to_numeric(values)[valid][order]
+        has_y = np.isfinite(y)
+        xs, ys = x[has_y], y[has_y]
+        if not len(xs):
+            continue
+        if method == "bucket":
+            buckets = bucket_aggregate(xs, ys, max_points)
+            series[name] = {"x": format_x(buckets["x"]), "mean": buckets["mean"].tolist(),
+                            "min": buckets["min"].tolist(), "max": buckets["max"].tolist()}
+        else:
+            kept = lttb(xs, ys, max_points)
+            series[name] = {"x": format_x(xs[kept]), "y": ys[kept].tolist()}
+
+    response["series"] = {"x_column": x_column, "method": method, "max_points": max_points, "data": series}
+    return response
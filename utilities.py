@@ -15,6 +15,10 @@ def query_extractor(text: str) -> str:
     start_index = text.find(start)
     end_index = text.find(end, start_index + len(start))
 
+    # The closing delimiter may be missing when the provider used it as a stop sequence
+    if start_index != -1 and end_index == -1:
+        end_index = len(text)
+
     # Check if both delimiters are found and extract the substring between them
     if start_index != -1 and end_index != -1:
         res = text[start_index + len(start):end_index]